@@ -139,10 +139,11 @@ Status PropagateShapes(Graph* graph,
       }
       if (n->type_string() == "TensorArrayGatherV3") {
         std::string input1_name = n->def().input(1);
-        if (resolved_range_sizes.count(input1_name)) {
+        auto range_size_it = resolved_range_sizes.find(input1_name);
+        if (range_size_it != resolved_range_sizes.end()) {
           PartialTensorShape shape(n->def().attr().at("element_shape").shape());
           if (shape.IsFullyDefined()) {
-            shape.InsertDim(0, resolved_range_sizes[input1_name]);
+            shape.InsertDim(0, range_size_it->second);
             shape_inference::ShapeHandle handle = context->output(0);
             TF_RETURN_IF_ERROR(
                 context->MakeShapeFromPartialTensorShape(shape, &handle));
@@ -154,26 +155,24 @@ Status PropagateShapes(Graph* graph,
       }
     }
 
-    if (n->type_string() == "Const") {
+    const std::string& op_type = n->type_string();
+    if (op_type == "Const") {
       const auto& tensor = n->def().attr().at("value").tensor();
       if (tensor.dtype() == DT_INT32 && tensor.int_val_size() == 1) {
         int64 int_val = tensor.int_val(0);
         resolved_ints[n->name()] = int_val;
         VLOG(2) << "filled resolved_ints[" << n->name() << "] with " << int_val;
       }
-    }
-
-    if (n->type_string() == "Shape") {
+    } else if (op_type == "Shape") {
       std::string input0_name = n->def().input(0);
-      if (resolved_shapes.count(input0_name)) {
-        auto& shape = resolved_shapes[input0_name];
+      auto shape_it = resolved_shapes.find(input0_name);
+      if (shape_it != resolved_shapes.end()) {
+        const auto& shape = shape_it->second;
         resolved_vectors[n->name()] = shape.dim_sizes();
         VLOG(2) << "filled resolved_vectors[" << n->name() << "] with vector "
                 << shape;
       }
-    }
-
-    if (n->type_string() == "StridedSlice") {
+    } else if (op_type == "StridedSlice") {
       const auto& n_def = n->def();
       const auto& attr = n_def.attr();
       if (attr.at("Index").type() == DT_INT32 &&
@@ -196,9 +195,7 @@ Status PropagateShapes(Graph* graph,
                   << int_val;
         }
       }
-    }
-
-    if (n->type_string() == "TensorArrayV3") {
+    } else if (op_type == "TensorArrayV3") {
       const auto& n_def = n->def();
       const auto& attr = n_def.attr();
       if (!attr.at("dynamic_size").b() && resolved_ints.count(n_def.input(0))) {
@@ -207,19 +204,16 @@ Status PropagateShapes(Graph* graph,
         VLOG(2) << "filled resolved_tensor_array_sizes[" << n->name()
                 << "] with " << int_val;
       }
-    }
-
-    if (n->type_string() == "TensorArraySizeV3") {
+    } else if (op_type == "TensorArraySizeV3") {
       const auto& n_def = n->def();
-      if (resolved_tensor_array_sizes.count(n_def.input(0))) {
-        int64 int_val = resolved_tensor_array_sizes[n_def.input(0)];
+      auto size_it = resolved_tensor_array_sizes.find(n_def.input(0));
+      if (size_it != resolved_tensor_array_sizes.end()) {
+        int64 int_val = size_it->second;
         resolved_tensor_array_sizes[n->name()] = int_val;
         VLOG(2) << "filled resolved_tensor_array_sizes[" << n->name()
                 << "] with " << int_val;
       }
-    }
-
-    if (n->type_string() == "Range") {
+    } else if (op_type == "Range") {
       const auto& n_def = n->def();
       const auto& attr = n_def.attr();
       if (attr.at("Tidx").type() == DT_INT32 &&
@@ -235,9 +229,7 @@ Status PropagateShapes(Graph* graph,
         VLOG(2) << "filled resolved_range_sizes[" << n->name() << "] with "
                 << num_elements;
       }
-    }
-
-    if (n->type_string() == "_Arg") {
+    } else if (op_type == "_Arg") {
       int index;
       TF_RETURN_IF_ERROR(GetNodeAttr(n->attrs(), "index", &index));
       auto it = arg_shapes.find(index);
@@ -262,13 +254,12 @@ Status PropagateShapes(Graph* graph,
             context->MakeShapeFromPartialTensorShape(arg_shape.shape, &handle));
         TF_RETURN_IF_ERROR(shape_refiner->SetShape(n, 0, handle));
       }
-    }
-
-    // Sometimes we have VariableShape nodes in while loop (after Enter nodes).
-    // They won't be constant-folded because TensorFlow constant folding does
-    // not handle Enter nodes (and thus does not handle any nodes after Enter
-    // nodes). We try to replace such VariableShape nodes with Const nodes here.
-    if (n->type_string() == "VariableShape") {
+    } else if (op_type == "VariableShape") {
+      // Sometimes we have VariableShape nodes in while loop (after Enter
+      // nodes). They won't be constant-folded because TensorFlow constant
+      // folding does not handle Enter nodes (and thus does not handle any
+      // nodes after Enter nodes). We try to replace such VariableShape nodes
+      // with Const nodes here.
       shape_inference::InferenceContext* context = shape_refiner->GetContext(n);
       auto handle_shapes_and_types = context->input_handle_shapes_and_types(0);
       if (handle_shapes_and_types && !handle_shapes_and_types->empty()) {
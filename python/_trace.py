@@ -25,7 +25,6 @@ from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
 from tensorflow.python.framework.errors import InvalidArgumentError
-from tensorflow.python.framework.tensor_shape import TensorShape
 from tensorflow.python.framework.tensor_spec import TensorSpec
 from tensorflow.python.grappler import tf_optimizer
 from tensorflow.python.keras.engine.training import Model
@@ -271,13 +270,14 @@ class OptionalDumper:
             return
         input_names = _get_input_names(func)
         tensor_name_map = {}
-        for nop in gdu.get_neuron_nodes(graph_def):
+        neuron_nodes = gdu.get_neuron_nodes(graph_def)
+        for nop in neuron_nodes:
             for idx, name in enumerate(nop.attr[gdu.knOutputNames].list.s):
                 neuron_tensor_name = nop.name if idx == 0 else '{}:{}'.format(nop.name, idx)
                 tensor_name_map[neuron_tensor_name] = name.decode()
         self.dump_tensor_map = {}
         dump_tensor_names = []
-        for nop in gdu.get_neuron_nodes(graph_def):
+        for nop in neuron_nodes:
             in_names = [tensor_name_map.get(name, name) for name in nop.input if not name.startswith('^')]
             in_names = [name if ':' in name else '{}:0'.format(name) for name in in_names]
             out_names = [name.decode() for name in nop.attr[gdu.knOutputNames].list.s]
@@ -375,17 +375,18 @@ def _get_feed_dict(func, inputs):
 def _run_shaper_and_fuser(graph_def, feed_dict, func, cfunc, subgraph_builder_function, dumper):
     new_graph_def, original_graph_def = _run_grappler_on_main_graph(graph_def, cfunc, subgraph_builder_function, dumper)
     name_mapping = {}
-    for node in gdu.get_neuron_nodes(new_graph_def):
+    neuron_nodes = gdu.get_neuron_nodes(new_graph_def)
+    for node in neuron_nodes:
         output_names = node.attr[gdu.knOutputNames].list.s
         for port, name in enumerate(output_names):
             name_mapping['{}:{}'.format(node.name, port)] = name.decode()
     need_shape_names = []
-    for node in gdu.get_neuron_nodes(new_graph_def):
+    for node in neuron_nodes:
         is_compilable, _ = gdu.neuron_node_is_compilable(node)
         if not is_compilable:
             input_shapes = node.attr[gdu.knInputShapes].list.shape
             for name, shape in zip(node.input, input_shapes):
-                if not TensorShape(shape).is_fully_defined():
+                if not gdu.shape_is_fully_defined(shape):
                     if ':' not in name:
                         name = '{}:0'.format(name)
                     need_shape_names.append(name_mapping.get(name, name))
@@ -12,10 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-import math
+import functools
+import itertools
+import operator
 import reprlib
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from tensorflow.core.framework import graph_pb2
+from tensorflow.core.framework import tensor_pb2
 from tensorflow.core.framework import types_pb2
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework.ops import convert_to_tensor
@@ -44,16 +47,14 @@ knInputCanUseShm = '_input_can_use_shm'
 knRealInputNames = '_real_input_names'
 knRealInputLocations = '_real_input_locations'
 vInvalidAxis = -1
+_shape_content_fn_map = {'Shape': TensorShape.as_list, 'Size': TensorShape.num_elements}
 
 
 def normalize_operators(graph_def):
-    gd_tensor_name_to_consumers = {}
+    gd_consumed_tensor_names = set()
     gd_tensor_name_to_shape = {}
     for node in graph_def.node:
-        for inp in node.input:
-            if inp not in gd_tensor_name_to_consumers:
-                gd_tensor_name_to_consumers[inp] = []
-            gd_tensor_name_to_consumers[inp].append(inp)
+        gd_consumed_tensor_names.update(node.input)
         if kOutputShapes in node.attr:
             for idx, shape in enumerate(node.attr[kOutputShapes].list.shape):
                 tensor_name = node.name if idx == 0 else '{}:{}'.format(node.name, idx)
@@ -67,7 +68,7 @@ def normalize_operators(graph_def):
             found_training_consumer = False
             for idx in range(3, 6):
                 gd_tensor_name = '{}:{}'.format(node.name, idx)
-                if gd_tensor_name_to_consumers.get(gd_tensor_name, False):
+                if gd_tensor_name in gd_consumed_tensor_names:
                     found_training_consumer = True
             if not found_training_consumer:
                 node.op = 'FusedBatchNorm'
@@ -91,13 +92,10 @@ def normalize_operators(graph_def):
 
 def encode_inferred_shapes(graph_def, shape_feed_dict=None):
     if shape_feed_dict is not None:
-        name_to_ports = {}
+        name_to_ports = defaultdict(set)
         for tensor_name in shape_feed_dict.keys():
-            node_name, port = tensor_name.split(':')
-            port = int(port)
-            if node_name not in name_to_ports:
-                name_to_ports[node_name] = set()
-            name_to_ports[node_name].add(port)
+            node_name, _, port = tensor_name.rpartition(':')
+            name_to_ports[node_name].add(int(port))
         for node in graph_def.node:
             if node.name in name_to_ports:
                 inferred_shapes = node.attr[kNeuronInferredShapes].list
@@ -111,7 +109,7 @@ def encode_inferred_shapes(graph_def, shape_feed_dict=None):
     for node in graph_def.node:
         if kOutputShapes in node.attr:
             output_shapes = node.attr[kOutputShapes]
-            if all(TensorShape(shape).is_fully_defined() for shape in output_shapes.list.shape):
+            if all(shape_is_fully_defined(shape) for shape in output_shapes.list.shape):
                 node.attr[kNeuronInferredShapes].CopyFrom(output_shapes)
     return graph_def
 
@@ -119,14 +117,9 @@ def encode_inferred_shapes(graph_def, shape_feed_dict=None):
 def encode_real_input_names_and_locations(graph_def):
     neuron_nodes = get_neuron_nodes(graph_def)
     for node in neuron_nodes:
-        real_input_names_list = []
-        real_input_locations_list = []
-        for i in range(len(node.input)):
-            if 'ReadVariableOp' not in node.input[i]:
-                real_input_names_list.append(node.input[i].encode())
-                real_input_locations_list.append(i)
-        node.attr[knRealInputNames].list.s[:] = real_input_names_list
-        node.attr[knRealInputLocations].list.i[:] = real_input_locations_list
+        real_inputs = [(idx, name) for idx, name in enumerate(node.input) if 'ReadVariableOp' not in name]
+        node.attr[knRealInputNames].list.s[:] = [name.encode() for _, name in real_inputs]
+        node.attr[knRealInputLocations].list.i[:] = [idx for idx, _ in real_inputs]
     return graph_def
   		  
 
@@ -144,24 +137,36 @@ def shape_inference_with_inputs(graph_def, sess, feed_dict):
         `input_shapes` and `output_shapes` filled.
     """
     neuron_nodes = get_neuron_nodes(graph_def)
-    tensor_name_map = {}
+    # (shape container, index, tensor name) of every shape that is not fully defined
+    undefined_input_shapes = []
+    undefined_output_shapes = []
     for node in neuron_nodes:
-        for port, name in enumerate(node.attr[knOutputNames].list.s):
-            tensor_name_map['{}:{}'.format(node.name, port)] = name.decode()
-    need_shape = []
-    for node in neuron_nodes:
-        input_shapes = node.attr[knInputShapes].list.shape
-        output_names = node.attr[knOutputNames].list.s
-        output_shapes = node.attr[knOutputShapes].list.shape
-        for name, shape_proto in zip(node.input, input_shapes):
-            if not TensorShape(shape_proto).is_fully_defined():
+        attr = node.attr
+        input_shapes = attr[knInputShapes].list.shape
+        output_names = attr[knOutputNames].list.s
+        output_shapes = attr[knOutputShapes].list.shape
+        for idx, (name, shape_proto) in enumerate(zip(node.input, input_shapes)):
+            if not shape_is_fully_defined(shape_proto):
                 if ':' not in name:
                     name = '{}:0'.format(name)
-                need_shape.append(tensor_name_map.get(name, name))
-        for name, shape_proto in zip(output_names, output_shapes):
-            if not TensorShape(shape_proto).is_fully_defined():
-                need_shape.append(name.decode())
-    need_shape = [sess.graph.get_tensor_by_name(name) for name in need_shape]
+                undefined_input_shapes.append((input_shapes, idx, name))
+        for idx, (name, shape_proto) in enumerate(zip(output_names, output_shapes)):
+            if not shape_is_fully_defined(shape_proto):
+                undefined_output_shapes.append((output_shapes, idx, name.decode()))
+    if not undefined_input_shapes and not undefined_output_shapes:
+        return graph_def
+    if undefined_input_shapes:
+        # inputs produced by other NeuronOp's are looked up by their original tensor names
+        tensor_name_map = {}
+        for node in neuron_nodes:
+            for port, name in enumerate(node.attr[knOutputNames].list.s):
+                tensor_name_map['{}:{}'.format(node.name, port)] = name.decode()
+        undefined_input_shapes = [(shapes, idx, tensor_name_map.get(name, name))
+                                  for shapes, idx, name in undefined_input_shapes]
+    undefined_shapes = undefined_input_shapes + undefined_output_shapes
+    # a tensor may feed several NeuronOp's or be both an output and an input; fetch it only once
+    need_shape_names = dict.fromkeys(name for _, _, name in undefined_shapes)
+    need_shape = [sess.graph.get_tensor_by_name(name) for name in need_shape_names]
     need_shape_infer = []
     for tensor in need_shape:
         if sess.graph.is_fetchable(tensor.op):
@@ -177,20 +182,10 @@ def shape_inference_with_inputs(graph_def, sess, feed_dict):
         logging.warning('running inference to find shape for {} ({} tensors)'
                         .format(ts_repr_str, len(need_shape_infer)))
         need_shape_infer_np = sess.run(need_shape_infer, feed_dict)
-        inferred_shapes = {ts.name: TensorShape(ts_np.shape) for ts, ts_np in zip(need_shape_infer, need_shape_infer_np)}
-        for node in neuron_nodes:
-            input_shapes = node.attr[knInputShapes].list.shape
-            output_names = node.attr[knOutputNames].list.s
-            output_shapes = node.attr[knOutputShapes].list.shape
-            for idx, (name, shape_proto) in enumerate(zip(node.input, input_shapes)):
-                if not TensorShape(shape_proto).is_fully_defined():
-                    if ':' not in name:
-                        name = '{}:0'.format(name)
-                    name = tensor_name_map.get(name, name)
-                    input_shapes[idx].CopyFrom(inferred_shapes[name].as_proto())
-            for idx, (name, shape_proto) in enumerate(zip(output_names, output_shapes)):
-                if not TensorShape(shape_proto).is_fully_defined():
-                    output_shapes[idx].CopyFrom(inferred_shapes[name.decode()].as_proto())
+        inferred_shapes = {ts.name: TensorShape(ts_np.shape).as_proto()
+                           for ts, ts_np in zip(need_shape_infer, need_shape_infer_np)}
+        for shapes, idx, name in undefined_shapes:
+            shapes[idx].CopyFrom(inferred_shapes[name])
     return graph_def
 
 
@@ -206,27 +201,19 @@ def inline_shape_inputs_in_subgraphs(graph_def):
     copying the entire graph would consume too much memory and it will become
     practical once we don't have to freeze the entire graph.
     """
-    name_to_node = {node.name: node for node in graph_def.node}
-    shape_content_fn_map = {'Shape': TensorShape.as_list, 'Size': TensorShape.num_elements}
+    name_to_node, neuron_nodes = index_graph_def(graph_def)
 
     def get_node(name):
         node_name, _ = split_tensor_name(name)
         return name_to_node[node_name]
 
-    def contains_shape_input(node):
-        # Returns True if any non-control input node is a shape-related operator
-        return any(get_node(name).op in shape_content_fn_map for name in node.input if not name.startswith('^'))
-
-    if not any(contains_shape_input(node) for node in get_neuron_nodes(graph_def)):
-        return graph_def
-    for node in get_neuron_nodes(graph_def):
-        subgraph_def = get_subgraph_def(node)
-        subgraph_name_to_node = {sn.name: sn for sn in subgraph_def.node}
+    for node in neuron_nodes:
         attr = node.attr
-        discards = set()
+        # find inlinable shape inputs before paying for parsing the subgraph
+        shape_inputs = []
         for idx, (input_name, ph_name) in enumerate(zip(node.input, attr[knInputNames].list.s)):
             input_node = get_node(input_name)
-            if input_node.op in shape_content_fn_map:
+            if input_node.op in _shape_content_fn_map:
                 shape_input_name, = input_node.input
                 shape_input_node_name, port = split_tensor_name(shape_input_name)
                 shape_input_node = name_to_node[shape_input_node_name]
@@ -235,36 +222,41 @@ def inline_shape_inputs_in_subgraphs(graph_def):
                     shape_attr = shape_input_node.attr.get(knOutputShapes, None)
                 if shape_attr is None:
                     continue
-                shape_proto = shape_attr.list.shape[port]
-                shape = TensorShape(shape_proto)
-                dtype_enum = input_node.attr['out_type'].type
-                dtype = dtypes.as_dtype(dtype_enum)
-                tensor_content = shape_content_fn_map[input_node.op](shape)
-                shape_tensor = convert_to_tensor(tensor_content, dtype)
-                ph_node_name, _ = split_tensor_name(ph_name.decode())
-                ph_node = subgraph_name_to_node[ph_node_name]
-                ph_node.attr['dtype'].type = dtype_enum
-                ph_node.attr.pop('shape')
-                tensor_proto = ph_node.attr['value'].tensor
-                tensor_proto.dtype = dtype_enum
-                tensor_proto.tensor_shape.CopyFrom(shape_tensor.shape.as_proto())
-                tensor_proto.tensor_content = shape_tensor.numpy().tobytes()
-                ph_node.op = 'Const'
-                discards.add(idx)
-        if not discards:
+                shape_inputs.append((idx, input_node, ph_name, shape_attr.list.shape[port]))
+        if not shape_inputs:
             continue
+        subgraph_def = get_subgraph_def(node)
+        subgraph_name_to_node = {sn.name: sn for sn in subgraph_def.node}
+        discards = set()
+        for idx, input_node, ph_name, shape_proto in shape_inputs:
+            shape = TensorShape(shape_proto)
+            dtype_enum = input_node.attr['out_type'].type
+            dtype = dtypes.as_dtype(dtype_enum)
+            tensor_content = _shape_content_fn_map[input_node.op](shape)
+            shape_tensor = convert_to_tensor(tensor_content, dtype)
+            ph_node_name, _ = split_tensor_name(ph_name.decode())
+            ph_node = subgraph_name_to_node[ph_node_name]
+            ph_node.attr['dtype'].type = dtype_enum
+            ph_node.attr.pop('shape')
+            tensor_proto = ph_node.attr['value'].tensor
+            tensor_proto.dtype = dtype_enum
+            tensor_proto.tensor_shape.CopyFrom(shape_tensor.shape.as_proto())
+            tensor_proto.tensor_content = shape_tensor.numpy().tobytes()
+            ph_node.op = 'Const'
+            discards.add(idx)
+
+        # node.input is the longest container as it also holds control inputs
+        keep_mask = [idx not in discards for idx in range(len(node.input))]
 
         def maybe_discard_from_scalar_container(container):
             if container:
-                container[:] = [value for idx, value in enumerate(container) if idx not in discards]
+                container[:] = list(itertools.compress(container, keep_mask))
 
         def maybe_discard_from_composite_container(container):
             if container:
-                new_values = [value for idx, value in enumerate(container) if idx not in discards]
-                while container:
-                    container.pop()
-                for value in new_values:
-                    container.add().CopyFrom(value)
+                new_values = list(itertools.compress(container, keep_mask))
+                del container[:]
+                container.extend(new_values)
 
         scalar_containers = [
             node.input,
@@ -286,7 +278,7 @@ def inline_shape_inputs_in_subgraphs(graph_def):
 def convert_shape_to_constant(graph_def):
     name_to_node = {node.name: node for node in graph_def.node}
     for node in graph_def.node:
-        if node.op in {'Shape', 'Size'}:
+        if node.op in _shape_content_fn_map:
             input_node_name, port = split_tensor_name(node.input[0])
             input_node = name_to_node[input_node_name]
             shape_proto = input_node.attr[kNeuronInferredShapes].list.shape[port]
@@ -300,10 +292,7 @@ def convert_shape_to_constant(graph_def):
                 dtype = dtypes.as_dtype(dtype_enum)
                 tensor_proto = node.attr['value'].tensor
                 tensor_proto.dtype = dtype_enum
-                if node.op == 'Shape':
-                    tensor_content = shape.as_list()
-                elif node.op == 'Size':
-                    tensor_content = shape.num_elements()
+                tensor_content = _shape_content_fn_map[node.op](shape)
                 shape_tensor = convert_to_tensor(tensor_content, dtype)
                 tensor_proto.tensor_shape.CopyFrom(shape_tensor.shape.as_proto())
                 tensor_proto.tensor_content = shape_tensor.numpy().tobytes()
@@ -319,8 +308,10 @@ def run_graph_def_pass_in_subgraphs(graph_def, graph_def_pass):
     return graph_def
 
 
+_IOTensor = namedtuple('IOTensor', 'name, dtype, shape')
+
+
 def run_compiler_on_subgraphs(graph_def, dumper):
-    IOTensor = namedtuple('IOTensor', 'name, dtype, shape')
     for node in get_neuron_nodes(graph_def):
         is_compilable, reason = neuron_node_is_compilable(node)
         if not is_compilable:
@@ -329,17 +320,9 @@ def run_compiler_on_subgraphs(graph_def, dumper):
 
         # get graph_def and io tensors
         subgraph_def = get_subgraph_def(node)
-        inputs = []
-        outputs = []
         nal = lambda key: node.attr[key].list
-        zip_inputs = zip(nal(knInputNames).s, nal(knInputDtypes).type, nal(knInputShapes).shape)
-        zip_outputs = zip(nal(knOutputNames).s, nal(knOutputDtypes).type, nal(knOutputShapes).shape)
-        for container, tensors in zip([inputs, outputs], [zip_inputs, zip_outputs]):
-            for name, dtype_enum, shape in tensors:
-                name = name.decode()
-                dtype = dtypes.as_dtype(dtype_enum)
-                tensor = IOTensor(name, dtype, shape)
-                container.append(tensor)
+        inputs = _io_tensors(nal(knInputNames).s, nal(knInputDtypes).type, nal(knInputShapes).shape)
+        outputs = _io_tensors(nal(knOutputNames).s, nal(knOutputDtypes).type, nal(knOutputShapes).shape)
 
         # remove attributes that are not recognized by neuron-cc
         for sg_node in subgraph_def.node:
@@ -390,6 +373,12 @@ def run_compiler_on_subgraphs(graph_def, dumper):
     return graph_def
 
 
+def _io_tensors(names, dtype_enums, shapes):
+    names = [name.decode() for name in names]
+    io_dtypes = [dtypes.as_dtype(dtype_enum) for dtype_enum in dtype_enums]
+    return [_IOTensor(*args) for args in zip(names, io_dtypes, shapes)]
+
+
 def neuron_node_is_compilable(node):
     reasons = []
     # skip compiling this subgraph for the following reasons
@@ -397,9 +386,9 @@ def neuron_node_is_compilable(node):
         reasons.append('it does not have inputs')
     if len(node.attr[knOutputNames].list.s) == 0:
         reasons.append('it does not have outputs')
-    if any(not TensorShape(shape).is_fully_defined() for shape in node.attr[knInputShapes].list.shape):
+    if any(not shape_is_fully_defined(shape) for shape in node.attr[knInputShapes].list.shape):
         reasons.append('input shapes are not fully defined')
-    if any(not TensorShape(shape).is_fully_defined() for shape in node.attr[knOutputShapes].list.shape):
+    if any(not shape_is_fully_defined(shape) for shape in node.attr[knOutputShapes].list.shape):
         reasons.append('output shapes are not fully defined')
     if reasons:
         return False, ' and '.join(reasons)
@@ -415,12 +404,13 @@ def restore_compiler_failures(compiled_graph_def, original_graph_def):
     signatures. To deal with these cases properly, we need to obtain original
     NodeDef messages from `original_graph_def` instead of `subgraph_def`.
     """
-    neuron_op_dict = {node.name: node for node in get_neuron_nodes(compiled_graph_def)}
+    name_to_node, neuron_nodes = index_graph_def(compiled_graph_def)
+    neuron_op_dict = {node.name: node for node in neuron_nodes}
     restore_nodes = []
     remove_node_names = set()
     gd_tensor_name_map = {}
-    all_expected_node_names = {node.name for node in compiled_graph_def.node if node.op != tNeuronOp}
-    for node in get_neuron_nodes(compiled_graph_def):
+    all_expected_node_names = name_to_node.keys() - neuron_op_dict.keys()
+    for node in neuron_nodes:
         if not node.attr[knExecutable].s:
             remove_node_names.add(node.name)
             subgraph_def = get_subgraph_def(node)
@@ -473,63 +463,70 @@ def restore_compiler_failures(compiled_graph_def, original_graph_def):
 
 def set_execution_plan(compiled_graph_def):
     # scan to get num neuroncores and total number of bytes of input and output tensors
-    num_cores_tuple_map = {}
+    neuron_nodes = get_neuron_nodes(compiled_graph_def)
+    if not neuron_nodes:
+        return compiled_graph_def
     mis_config = False
-    neuron_nodes = list(get_neuron_nodes(compiled_graph_def))
+    global_opt_num_cores = -1
+    executable_sizes = []
+    opt_num_cores_list = []
     for node in neuron_nodes:
-        num_cores_tuple = neff_util.get_cores_from_executable(node.attr[knExecutable].s)
+        # reading attr 's' copies the entire NEFF out of the proto, so do it only once per node
+        executable = node.attr[knExecutable].s
+        executable_sizes.append(len(executable))
+        num_cores_tuple = neff_util.get_cores_from_executable(executable)
         if num_cores_tuple is None:
             mis_config = True
+            opt_num_cores_list.append(-1)
         else:
             opt_num_cores, _ = num_cores_tuple
-            num_cores_tuple_map[node.name] = num_cores_tuple
-    max_num_duplicates = 64
+            if opt_num_cores > global_opt_num_cores:
+                global_opt_num_cores = opt_num_cores
+            opt_num_cores_list.append(opt_num_cores)
     tfn_args, _ = utils.parse_neuron_cc_flags()
-    if mis_config or not num_cores_tuple_map:
+    if mis_config:
         global_opt_num_cores = -1
+    if mis_config or len(neuron_nodes) > 1:
+        # if there are many NeuronOp's in the graph, then don't do any duplication
         max_num_duplicates = 1
     elif tfn_args.extract_weights:
-        max_num_duplicates = min(4, calculate_max_num_cores(compiled_graph_def))
-        global_opt_num_cores = max(opt_nc for opt_nc, _ in num_cores_tuple_map.values())
+        max_num_duplicates = min(4, calculate_max_num_cores(compiled_graph_def, neuron_nodes, executable_sizes))
     else:
-        global_opt_num_cores = max(opt_nc for opt_nc, _ in num_cores_tuple_map.values())
-    if len(neuron_nodes) > 1:
-        # if there are many NeuronOp's in the graph, then don't do any duplication
-        max_num_duplicates = 1
-    for node in neuron_nodes:
-        if node.name in num_cores_tuple_map:
-            this_opt_num_cores, _ = num_cores_tuple_map[node.name]
-        else:
-            this_opt_num_cores = -1
+        max_num_duplicates = 64
+    for node, this_opt_num_cores, executable_size in zip(neuron_nodes, opt_num_cores_list, executable_sizes):
         # Minimum timeout is 10 sec
         # For big models, we arbitrarily allocate 10 sec quota per 1 GB model size.
-        est_timeout = len(node.attr[knExecutable].s) / 1e8
+        est_timeout = executable_size / 1e8
         timeout = int(max(est_timeout, 10))
         # if this_opt_num_cores is smaller than actual num_cores in runtime, will enforce ninfer==1
-        model_config = [global_opt_num_cores, this_opt_num_cores, max_num_duplicates, timeout]
+        model_config = global_opt_num_cores, this_opt_num_cores, max_num_duplicates, timeout
         node.attr['model_config'].list.i[:] = model_config
     return compiled_graph_def
 
 
-def calculate_max_num_cores(compiled_graph_def):
+def calculate_max_num_cores(compiled_graph_def, neuron_nodes=None, executable_sizes=None):
     # returns the amount number of models that can fit on one channel of memory
     # NEFF and Weights get loaded into device memory and
     # One channel of memory is 4gb and there are two channels on an inf1.2xlarge
     # TODO: Support all inf1 instance types
-    neuron_nodes = get_neuron_nodes(compiled_graph_def)
-    neff_size = 0
+    if neuron_nodes is None:
+        neuron_nodes = get_neuron_nodes(compiled_graph_def)
+    if executable_sizes is None:
+        executable_sizes = [len(node.attr[knExecutable].s) for node in neuron_nodes]
+    neff_size = sum(executable_sizes)
     weights_size = 0
+    dtype_size_map = {}  # DataType enum -> size in bytes, looked up once per dtype
 
     for node in neuron_nodes:
-        neff_size += len(node.attr[knExecutable].s)
-        for shape, dtype in zip(node.attr['input_shapes'].list.shape, node.attr['input_dtypes'].list.type):
-            num_elements = 1 #accumulator var for calcuating number of elements in a given input tensor
-            for dim in shape.dim:
-                num_elements *= dim.size
+        attr = node.attr
+        for shape, dtype in zip(attr[knInputShapes].list.shape, attr[knInputDtypes].list.type):
+            num_elements = functools.reduce(operator.mul, (dim.size for dim in shape.dim), 1)
+            if dtype not in dtype_size_map:
+                dtype_size_map[dtype] = dtypes.as_dtype(dtype).size
             #multiply num of elements * dtype size to get size of tensor
-            weights_size += num_elements * dtypes.as_dtype(dtype).size
+            weights_size += num_elements * dtype_size_map[dtype]
 
-    return math.floor(4e9 / (neff_size + weights_size)) * 2
+    return 4000000000 // (neff_size + weights_size) * 2
 
 
 
@@ -537,6 +534,21 @@ def get_neuron_nodes(graph_def):
     return [node for node in graph_def.node if node.op == tNeuronOp]
 
 
+def index_graph_def(graph_def):
+    """Returns `(name_to_node, neuron_nodes)` collected in a single walk over `graph_def`.
+
+    The index is not cached across passes as most passes mutate `graph_def` in place;
+    passes that add, remove, or rename nodes must build a new index afterwards.
+    """
+    name_to_node = {}
+    neuron_nodes = []
+    for node in graph_def.node:
+        name_to_node[node.name] = node
+        if node.op == tNeuronOp:
+            neuron_nodes.append(node)
+    return name_to_node, neuron_nodes
+
+
 def get_subgraph_def(node, volatile=False):
     graph_def = graph_pb2.GraphDef()
     graph_def.ParseFromString(node.attr[knGraphDef].s)
@@ -551,18 +563,10 @@ def erase_large_constants(graph_def):
     for node in graph_def.node:
         if node.op == 'Const' and node.ByteSize() > large_const_threshold:
             tensor = node.attr['value'].tensor
-            tensor.tensor_content = b''
-            tensor.bool_val[:] = []
-            tensor.dcomplex_val[:] = []
-            tensor.double_val[:] = []
-            tensor.float_val[:] = []
-            tensor.half_val[:] = []
-            tensor.int64_val[:] = []
-            tensor.int_val[:] = []
-            tensor.scomplex_val[:] = []
-            tensor.string_val[:] = []
-            tensor.uint32_val[:] = []
-            tensor.uint64_val[:] = []
+            # keep only dtype, shape and version; all value fields are dropped
+            stripped_tensor = tensor_pb2.TensorProto(
+                dtype=tensor.dtype, tensor_shape=tensor.tensor_shape, version_number=tensor.version_number)
+            tensor.CopyFrom(stripped_tensor)
     return graph_def
 
 
@@ -594,18 +598,27 @@ def prefix_node_names(graph_def):
             new_tensor_name = format_tensor_name('{}:{}'.format(new_op_name, idx))
             name_change_map[tensor_name] = new_tensor_name
         node.name = new_op_name
+    if not name_change_map:
+        return graph_def
     for node in graph_def.node:
-        node.input[:] = [name_change_map.get(inp, inp) for inp in node.input]
+        for idx, inp in enumerate(node.input):
+            if inp in name_change_map:
+                node.input[idx] = name_change_map[inp]
     return graph_def
 
 
+def shape_is_fully_defined(shape_proto):
+    # same as TensorShape(shape_proto).is_fully_defined() without building a TensorShape
+    return not shape_proto.unknown_rank and all(dim.size >= 0 for dim in shape_proto.dim)
+
+
 def format_tensor_name(tensor_name):
-    return tensor_name.split(':')[0] if tensor_name.endswith(':0') else tensor_name
+    return tensor_name[:-2] if tensor_name.endswith(':0') else tensor_name
 
 
 def split_tensor_name(tensor_name):
-    op_name, port = tensor_name.split(':') if ':' in tensor_name else (tensor_name, 0)
-    return op_name, int(port)
+    op_name, sep, port = tensor_name.rpartition(':')
+    return (op_name, int(port)) if sep else (tensor_name, 0)
 
 
 def get_node_with_control_inputs(graph_def):
@@ -618,19 +631,20 @@ def get_node_with_control_inputs(graph_def):
 
 
 def compiled_graph_op_counts(graph_def):
-    neuron_nodes = [node for node in graph_def.node if node.op == tNeuronOp]
+    neuron_nodes = get_neuron_nodes(graph_def)
     num_ops_on_neuron = 0
     for node in neuron_nodes:
-        if node.attr['executable'].s:
+        attr = node.attr
+        if attr[knExecutable].s:
             subgraph_def = get_subgraph_def(node)
-            num_ops_on_neuron += len(subgraph_def.node) - len(node.attr['input_names'].list.s)
+            num_ops_on_neuron += len(subgraph_def.node) - len(attr[knInputNames].list.s)
     num_ops_tfn = len(graph_def.node) + num_ops_on_neuron - len(neuron_nodes)
     return max(num_ops_tfn, 0), max(num_ops_on_neuron, 0)
 
 
 def _graph_def_op_index(graph_def_tensor_name):
-    if ':' in graph_def_tensor_name:
-        op_name, value_index = graph_def_tensor_name.split(':')
+    op_name, sep, value_index = graph_def_tensor_name.rpartition(':')
+    if sep:
         value_index = int(value_index)
     else:
         op_name, value_index = graph_def_tensor_name, 0
@@ -12,9 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-import sys
 import os
 import signal
+import struct
 import argparse
 import time
 import tempfile
@@ -24,7 +24,6 @@ from concurrent.futures import ThreadPoolExecutor
 import subprocess
 import shlex
 import collections
-from copy import deepcopy
 import itertools
 from distutils import spawn
 from contextlib import contextmanager
@@ -38,7 +37,7 @@ from tensorflow.python.framework import graph_util_impl as tf_graph_util
 from tensorflow.python.framework.tensor_shape import TensorShape, dimension_value
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import nn_ops
-from tensorflow.core.framework import attr_value_pb2, graph_pb2
+from tensorflow.core.framework import attr_value_pb2
 from tensorflow.python.grappler import tf_optimizer
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.core.protobuf import rewriter_config_pb2
@@ -50,6 +49,7 @@ from tensorflow_neuron.python import neuron_cc as ncc
 from tensorflow_neuron.python import utils
 
 tNeuronOp = 'NeuronOp'
+_NEURON_EXECUTABLE_NAME = 'graph_def.neff'
 
 @deprecated(None, 'Please refer to AWS documentation on Neuron integrated TensorFlow 2.0.')
 def inference_graph_from_session(
@@ -130,9 +130,10 @@ def inference_graph_from_session(
                 compiler_args.extend(neuron_cc_args)
     if sess is None:
         sess = ops.get_default_session()
-    if feed_dict is not None:
+    sess_ops = sess.graph.get_operations()
+    if feed_dict is not None and not all(isinstance(key, str) for key in feed_dict):
         feed_dict = {getattr(ts, 'name', ts): value for ts, value in feed_dict.items()}
-    if shape_feed_dict is not None:
+    if shape_feed_dict is not None and not all(isinstance(key, str) for key in shape_feed_dict):
         shape_feed_dict = {getattr(ts, 'name', ts): value for ts, value in shape_feed_dict.items()}
     if signature_def is None:
         # build a SignatureDef from input/output tensors
@@ -142,14 +143,14 @@ def inference_graph_from_session(
             elif shape_feed_dict is not None:
                 input_names = shape_feed_dict.keys()
             else:
-                input_names = [op.outputs[0].name for op in sess.graph.get_operations()
-                                                  if op.type == 'Placeholder']
+                input_names = [op.outputs[0].name for op in sess_ops if op.type == 'Placeholder']
         else:
             input_names = [getattr(ts, 'name', ts) for ts in input_tensors]
         input_tensors = [sess.graph.get_tensor_by_name(name) for name in input_names]
         if output_tensors is None:
-            output_ops = [op for op in sess.graph.get_operations()
-                             if all(not ts.consumers() for ts in op.outputs)]
+            consumed_names = {ts.name for op in sess_ops for ts in op.inputs}
+            output_ops = [op for op in sess_ops
+                          if all(ts.name not in consumed_names for ts in op.outputs)]
             output_names = [ts.name for op in output_ops for ts in op.outputs]
         else:
             output_names = [getattr(ts, 'name', ts) for ts in output_tensors]
@@ -161,17 +162,20 @@ def inference_graph_from_session(
         protected_op_names = set()
     protected_op_names = set(protected_op_names)
     io_infos = itertools.chain(signature_def.inputs.values(), signature_def.outputs.values())
-    protected_op_names.update(sess.graph.get_tensor_by_name(info.name).op.name for info in io_infos)
+    protected_tensor_names = [info.name for info in io_infos]
     if feed_dict is not None:
-        protected_op_names.update(sess.graph.get_tensor_by_name(name).op.name
-                                  for name in feed_dict.keys())
+        protected_tensor_names.extend(feed_dict.keys())
         if shape_feed_dict is None:
-            key_dict = {key: key for key in feed_dict}
-            evaluated_feed_dict = sess.run(key_dict, feed_dict)
-            shape_feed_dict = {key: value.shape for key, value in evaluated_feed_dict.items()}
+            if all(hasattr(value, 'shape') for value in feed_dict.values()):
+                # feeding numpy arrays; no need to evaluate them through the session
+                shape_feed_dict = {key: value.shape for key, value in feed_dict.items()}
+            else:
+                key_dict = {key: key for key in feed_dict}
+                evaluated_feed_dict = sess.run(key_dict, feed_dict)
+                shape_feed_dict = {key: value.shape for key, value in evaluated_feed_dict.items()}
     if shape_feed_dict is not None:
-        protected_op_names.update(sess.graph.get_tensor_by_name(name).op.name
-                                  for name in shape_feed_dict.keys())
+        protected_tensor_names.extend(shape_feed_dict.keys())
+    protected_op_names.update(gdu.split_tensor_name(name)[0] for name in protected_tensor_names)
 
     if grappler:
         with sess.graph.as_default():
@@ -198,28 +202,26 @@ def inference_graph_from_session(
 
     # setup op exclusions
     no_fuse_ops = set() if no_fuse_ops is None else set(no_fuse_ops)
-    control_op_names = [node.name for node in graph_def.node if _has_control_input(node)]
-
-    # exclude ops with control outputs
-    no_fuse_ops.update(control_op_names)
-
-    # exclude ops that are attached to string tensors
     name_to_consumers = {}
+    string_op_names = []
+    dt_string = dtypes.string.as_datatype_enum
     for node in graph_def.node:
+        # exclude ops with control outputs
+        if _has_control_input(node):
+            no_fuse_ops.add(node.name)
         for inp in node.input:
             input_node_name = inp[:inp.index(':')] if ':' in inp else inp
             if input_node_name not in name_to_consumers:
                 name_to_consumers[input_node_name] = set()
             name_to_consumers[input_node_name].add(node.name)
-    for node in graph_def.node:
-        if 'T' in node.attr:
-            if node.attr['T'].type == dtypes.string.as_datatype_enum:
-                no_fuse_ops.add(node.name)
-                no_fuse_ops.update(name_to_consumers.get(node.name, []))
-        if 'dtype' in node.attr:
-            if node.attr['dtype'].type == dtypes.string.as_datatype_enum:
-                no_fuse_ops.add(node.name)
-                no_fuse_ops.update(name_to_consumers.get(node.name, []))
+        for key in 'T', 'dtype':
+            if key in node.attr and node.attr[key].type == dt_string:
+                string_op_names.append(node.name)
+
+    # exclude ops that are attached to string tensors
+    for name in string_op_names:
+        no_fuse_ops.add(name)
+        no_fuse_ops.update(name_to_consumers.get(name, []))
 
     # normalize operators
     graph_def = gdu.normalize_operators(graph_def)
@@ -281,7 +283,7 @@ def inference_graph_from_session(
     compiled_graph = _graph_def_to_graph(compiled_graph_def)
 
     # statistics on number of operations
-    num_ops_original = len(sess.graph.get_operations())
+    num_ops_original = len(sess_ops)
     num_ops_tfn, num_ops_on_neuron = gdu.compiled_graph_op_counts(compiled_graph_def)
     with utils.logging_show_info():
         logging.info('Number of operations in TensorFlow session: {}'.format(num_ops_original))
@@ -486,9 +488,13 @@ def whitelist_partition(graph_def, signature_def,
     fuser_config.name = 'aws_neuron_fuse_supported_operators'
     param_map = fuser_config.parameter_map
     param_map['minimum_segment_size'].i = minimum_segment_size
-    param_map['supported_op_types'].list.s.extend(compat.as_bytes(item) for item in supported_op_types)
-    param_map['no_fuse_ops'].list.s.extend(compat.as_bytes(getattr(item, 'name', item)) for item in no_fuse_ops)
-    param_map['force_fuse_ops'].list.s.extend(compat.as_bytes(getattr(item, 'name', item)) for item in force_fuse_ops)
+    # convert op lists to bytes once; the fuser config and the optimizer config node both take them
+    supported_op_types = [compat.as_bytes(item) for item in supported_op_types]
+    no_fuse_ops = [compat.as_bytes(getattr(item, 'name', item)) for item in no_fuse_ops]
+    force_fuse_ops = [compat.as_bytes(getattr(item, 'name', item)) for item in force_fuse_ops]
+    param_map['supported_op_types'].list.s.extend(supported_op_types)
+    param_map['no_fuse_ops'].list.s.extend(no_fuse_ops)
+    param_map['force_fuse_ops'].list.s.extend(force_fuse_ops)
 
     # create meta_graph_def and run grappler passes
     meta_graph_def = meta_graph_pb2.MetaGraphDef(graph_def=graph_def)
@@ -498,13 +504,19 @@ def whitelist_partition(graph_def, signature_def,
 
     # add subgraph's control input to `NeuronOp`'s control input
     original_node_with_control_inputs = gdu.get_node_with_control_inputs(original_graph_def)
+    if not original_node_with_control_inputs:
+        return graph_def
     post_part_node_names = {node.name for node in graph_def.node}
     for node in gdu.get_neuron_nodes(graph_def):
+        node_inputs = set(node.input)
+        new_control_inputs = []
         for sg_node in gdu.get_subgraph_def(node).node:
             if sg_node.name in original_node_with_control_inputs:
                 for inp in original_node_with_control_inputs[sg_node.name]:
-                    if inp.lstrip('^') in post_part_node_names and inp not in node.input:
-                        node.input.append(inp)
+                    if inp.lstrip('^') in post_part_node_names and inp not in node_inputs:
+                        node_inputs.add(inp)
+                        new_control_inputs.append(inp)
+        node.input.extend(new_control_inputs)
     return graph_def
 
 
@@ -541,9 +553,8 @@ def compile_subgraphs(graph_def,
         workdir_base = os.path.abspath(workdir)
     if timeout is None:
         timeout = 18000
-    Compiler = collections.namedtuple('Compiler', 'command verbose workdir_path subgraph_info')
+    Compiler = collections.namedtuple('Compiler', 'command verbose workdir_path subgraph_info io_config_json')
     _neuron_cc_input_name = 'graph_def.pb'
-    _neuron_executable_name = 'graph_def.neff'
     neuron_cc = ncc.find_neuron_cc()
     if neuron_cc is None:
         return graph_def
@@ -560,7 +571,7 @@ def compile_subgraphs(graph_def,
         if io_config_json is None:
             logging.warning('Not fusing subgraph {}: --io-config error'.format(subgraph_info))
             continue
-        if any(not TensorShape(shape).is_fully_defined() for shape in node.attr['output_shapes'].list.shape):
+        if any(not gdu.shape_is_fully_defined(shape) for shape in node.attr['output_shapes'].list.shape):
             logging.warning('Cannot infer output tensor shapes for subgraph {}'.format(node.name))
             continue
         subgraph_def = gdu.get_subgraph_def(node)
@@ -575,7 +586,7 @@ def compile_subgraphs(graph_def,
             f.write(subgraph_def.SerializeToString())
         command = [neuron_cc, 'compile', input_path, '--framework', 'TENSORFLOW',
                    '--pipeline', 'compile', 'SaveTemps',
-                   '--output', os.path.join(workdir_path, _neuron_executable_name)]
+                   '--output', os.path.join(workdir_path, _NEURON_EXECUTABLE_NAME)]
         command.extend(['--io-config', io_config_json])
         if args_dict is not None:
             extend_args = args_dict.get(node.name, [])
@@ -584,7 +595,7 @@ def compile_subgraphs(graph_def,
             command.extend(extend_args)
         if verbose is not None:
             command.extend(['--verbose', str(verbose)])
-        subgraph_compilers[node.name] = Compiler(command, verbose, workdir_path, subgraph_info)
+        subgraph_compilers[node.name] = Compiler(command, verbose, workdir_path, subgraph_info, io_config_json)
 
     # try progress bar mode first
     try_progress_bar_mode = len(subgraph_compilers) == 1 and verbose is None and workdir is None
@@ -592,11 +603,12 @@ def compile_subgraphs(graph_def,
     parser.add_argument('--verbose', type=int, default=None)
     verbose_args, _ = parser.parse_known_args(command)
     progress_bar_mode_done = False
+    executables = {}
     if try_progress_bar_mode and (verbose_args.verbose is None or verbose_args.verbose == 35):
         node_name = next(iter(subgraph_compilers))
         command = subgraph_compilers[node_name].command.copy()
         command.extend(['--verbose=35'])
-        _, _, workdir_path, subgraph_info = subgraph_compilers[node_name]
+        _, _, workdir_path, subgraph_info, _ = subgraph_compilers[node_name]
         info_string = 'fusing subgraph {} with neuron-cc'.format(subgraph_info)
         with utils.logging_show_info():
             logging.info(info_string)
@@ -624,14 +636,9 @@ def compile_subgraphs(graph_def,
         if max_num_compilers is None:
             num_cpu = multiprocessing.cpu_count()
             try:
-                with open('/proc/meminfo') as f:
-                    for line in f:
-                        if 'MemAvailable' in line:
-                            available_mem_in_kb = int(line.split()[1])
-                            break
-                num_mem_gb = int(available_mem_in_kb / 4e6)  # 4 GB memory for each neuron-cc process
+                num_mem_gb = int(_available_mem_bytes() / 4e9)  # 4 GB memory for each neuron-cc process
                 max_num_compilers = max(1, min(num_cpu, num_mem_gb))
-            except:
+            except (OSError, ValueError):
                 max_num_compilers = num_cpu
         with ThreadPoolExecutor(max_workers=max_num_compilers) as executor:
             compiler_returns = {
@@ -639,24 +646,40 @@ def compile_subgraphs(graph_def,
                     _fork_compiler, subgraph_compilers, node_name, timeout, try_progress_bar_mode)
                 for node_name in subgraph_compilers.keys()
             }
-            compiler_returns = {key: value.result() for key, value in compiler_returns.items()}
+            executables = {key: value.result() for key, value in compiler_returns.items()}
         for node_name in subgraph_compilers.keys():
-            if not compiler_returns[node_name]:
+            if executables[node_name] is None:
                 subgraph_compilers[node_name] = None
 
     # fill NeuronOp properties
-    for node in gdu.get_neuron_nodes(graph_def):
+    for node in neuron_nodes:
         node.attr['input_batch_axis'].list.i[:] = [-1 for _ in node.attr['input_names'].list.s]
         node.attr['output_batch_axis'].list.i[:] = [-1 for _ in node.attr['output_names'].list.s]
         if subgraph_compilers.get(node.name, None) is None:
             continue
-        workdir_path = subgraph_compilers[node.name].workdir_path
-        executable_path = os.path.join(workdir_path, _neuron_executable_name)
-        with open(executable_path, 'rb') as f:
-            node.attr['executable'].s = f.read()
+        # pop so that each NEFF is freed once it has been copied into the proto
+        executable = executables.pop(node.name, None)
+        if executable is None:  # compiled in progress bar mode
+            workdir_path = subgraph_compilers[node.name].workdir_path
+            executable_path = os.path.join(workdir_path, _NEURON_EXECUTABLE_NAME)
+            with open(executable_path, 'rb') as f:
+                executable = f.read()
+        node.attr['executable'].s = executable
     return graph_def
 
 
+def _available_mem_bytes():
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # MemAvailable is unavailable on old kernels; free memory is a conservative estimate
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+
 def _io_tensor_info(node):
     input_names = node.attr['input_names'].list.s
     input_dtypes = node.attr['input_dtypes'].list.type
@@ -686,7 +709,7 @@ def _fork_compiler(subgraph_compilers, node_name, timeout, try_progress_bar_mode
     compiler = subgraph_compilers[node_name]
     if compiler is None:
         return None
-    command, verbose, workdir_path, subgraph_info = compiler
+    command, verbose, workdir_path, subgraph_info, io_config_json = compiler
     logfile = os.path.join(workdir_path, 'graph_def.neuron-cc.log')
     info_string = 'fusing subgraph {} with neuron-cc'.format(subgraph_info)
     if not verbose:
@@ -701,13 +724,15 @@ def _fork_compiler(subgraph_compilers, node_name, timeout, try_progress_bar_mode
         with open(logfile, 'w') as logfd:
             proc = subprocess.Popen(command, cwd=workdir_path, stdout=logfd, stderr=logfd)
             returncode = _wait_compiler(proc, timeout)
-    io_config_index = command.index('--io-config')
     with open(os.path.join(workdir_path, 'graph_def.io-config.json'), 'w') as f:
-        f.write(command[io_config_index+1])
+        f.write(io_config_json)
     if returncode != 0:
         logging.warning("Failed to fuse subgraph {} with '{}'".format(subgraph_info, subprocess.list2cmdline(command)))
         return None
-    return True
+    # read the executable here so that file reads overlap with other running compilers
+    executable_path = os.path.join(workdir_path, _NEURON_EXECUTABLE_NAME)
+    with open(executable_path, 'rb') as f:
+        return f.read()
 
 
 def _wait_compiler(proc, timeout):
@@ -803,10 +828,14 @@ def nchw_to_nhwc(graph_def):
                     tensor_nchw = array_ops.transpose(tensor_nhwc, [0, 3, 1, 2])
                 remove_node_names.add(op.name)
                 node_rename_map[tensor_nchw.op.name] = op.name
-    temp_graph_def = graph.as_graph_def()
-    graph_def = graph_pb2.GraphDef()
-    graph_def.node.MergeFrom(
-        node for node in temp_graph_def.node if node.name not in remove_node_names)
+    # drop replaced nodes in place rather than copying every node (and its weights) into a new GraphDef
+    graph_def = graph.as_graph_def()
+    graph_def.ClearField('library')
+    graph_def.ClearField('versions')
+    nodes = graph_def.node
+    for idx in reversed(range(len(nodes))):
+        if nodes[idx].name in remove_node_names:
+            del nodes[idx]
     for node in graph_def.node:
         if node.name in node_rename_map:
             node.name = node_rename_map[node.name]
@@ -815,8 +844,9 @@ def nchw_to_nhwc(graph_def):
 
 def set_dynamic_batch_size(compiled_graph_def):
     dbs = DynamicBatchSizeHelper()
-    subgraph_enable_map = {}
-    for node in gdu.get_neuron_nodes(compiled_graph_def):
+    neuron_nodes = gdu.get_neuron_nodes(compiled_graph_def)
+    subgraph_map = {}
+    for node in neuron_nodes:
         subgraph = _get_subgraph(node, volatile=True)
         input_names = [name.decode() for name in node.attr['input_names'].list.s]
         output_names = [name.decode() for name in node.attr['output_names'].list.s]
@@ -828,15 +858,15 @@ def set_dynamic_batch_size(compiled_graph_def):
             inputs, outputs = dbs.dynamic_inputs_outputs(op)
             if all(tensor_dynamic_map.get(ts.name, False) for ts in inputs):
                 tensor_dynamic_map.update((ts.name, True) for ts in outputs)
-        subgraph_enable_map[node.name] = all(tensor_dynamic_map.get(name, False) for name in input_names + output_names)
-    dynamic_batch_size = subgraph_enable_map and all(
-        subgraph_enable_map.get(node.name, False) for node in gdu.get_neuron_nodes(compiled_graph_def))
-    if dynamic_batch_size:
-        for node in gdu.get_neuron_nodes(compiled_graph_def):
-            subgraph = _get_subgraph(node, volatile=True)
-            node.attr['input_batch_axis'].list.i[:] = _batch_axis(node, subgraph, 'input_names')
-            node.attr['output_batch_axis'].list.i[:] = _batch_axis(node, subgraph, 'output_names')
-    return compiled_graph_def, dynamic_batch_size
+        if not all(tensor_dynamic_map.get(name, False) for name in input_names + output_names):
+            # a single subgraph without dynamic batch size disables it for the whole graph
+            return compiled_graph_def, False
+        subgraph_map[node.name] = subgraph
+    for node in neuron_nodes:
+        subgraph = subgraph_map[node.name]
+        node.attr['input_batch_axis'].list.i[:] = _batch_axis(node, subgraph, 'input_names')
+        node.attr['output_batch_axis'].list.i[:] = _batch_axis(node, subgraph, 'output_names')
+    return compiled_graph_def, bool(neuron_nodes)
 
 
 class DynamicBatchSizeHelper:
@@ -867,71 +897,68 @@ class DynamicBatchSizeHelper:
     }
 
     def dynamic_inputs_outputs(self, op):
-        if op.type in DynamicBatchSizeHelper.unary_ops:
-            return list(op.inputs), op.outputs
-        elif op.type in DynamicBatchSizeHelper.binary_broadcast_ops:
-            shape0, shape1 = [ts.shape for ts in op.inputs]
-            if shape0.rank is None or shape1.rank is None:
+        handler = DynamicBatchSizeHelper._handler_map.get(op.type, None)
+        if handler is None:
+            return [], []
+        return handler(self, op)
+
+    def _unary(self, op):
+        return list(op.inputs), op.outputs
+
+    def _binary_broadcast(self, op):
+        shape0, shape1 = [ts.shape for ts in op.inputs]
+        if shape0.rank is None or shape1.rank is None:
+            return [], []
+        if shape0.rank > shape1.rank:
+            return [op.inputs[0]], op.outputs
+        elif shape0.rank < shape1.rank:
+            return [op.inputs[1]], op.outputs
+        else:  # same rank
+            if shape0.rank == 0:
                 return [], []
-            if shape0.rank > shape1.rank:
-                return [op.inputs[0]], op.outputs
-            elif shape0.rank < shape1.rank:
-                return [op.inputs[1]], op.outputs
-            else:  # same rank
-                inputs = []
-                if len(shape0) > 0 and shape0.as_list()[0] is None:
-                    inputs.append(op.inputs[0])
-                if len(shape1) > 0 and shape0.as_list()[0] is None:
-                    inputs.append(op.inputs[1])
-                return inputs, op.outputs
-        elif op.type in DynamicBatchSizeHelper.reduce_axis_ops:
-            axis_op = op.inputs[-1].op
-            if axis_op.type == 'Const':
-                axis_list = _get_int32_values(axis_op)
-                if axis_list and 0 not in axis_list:
-                    return list(op.inputs[:-1]), op.outputs
-        elif op.type in DynamicBatchSizeHelper.pseudo_unary_ops:
+            # an input with static batch size 1 is broadcast; any other input determines the batch size
+            inputs = [ts for ts, shape in zip(op.inputs, [shape0, shape1]) if dimension_value(shape[0]) != 1]
+            if not inputs:
+                return [], []
+            return inputs, op.outputs
+
+    def _reduce_axis(self, op):
+        axis_op = op.inputs[-1].op
+        if axis_op.type == 'Const':
+            axis_list = _get_int32_values(axis_op)
+            if axis_list and 0 not in axis_list:
+                return list(op.inputs[:-1]), op.outputs
+        return [], []
+
+    def _pseudo_unary(self, op):
+        return list(op.inputs[:1]), op.outputs
+
+    def _concat(self, op):
+        axis_op = op.inputs[-1].op
+        if axis_op.type == 'Const':
+            axis_list = _get_int32_values(axis_op)
+            if any(axis < 0 for axis in axis_list):
+                rank = op.inputs[0].shape.rank
+                if rank is None:
+                    return [], []
+                axis_list = [axis if axis >= 0 else (axis + rank) for axis in axis_list]
+            if axis_list and 0 not in axis_list:
+                return list(op.inputs[:-1]), op.outputs
+        return [], []
+
+    def _matmul(self, op):
+        if not op.node_def.attr['transpose_a'].b:
             return list(op.inputs[:1]), op.outputs
-        elif op.type in {'Concat', 'ConcatV2'}:
-            axis_op = op.inputs[-1].op
-            if axis_op.type == 'Const':
-                axis_list = _get_int32_values(axis_op)
-                if any(axis < 0 for axis in axis_list):
-                    rank = op.inputs[0].shape.rank
-                    if rank is None:
-                        return [], []
-                    axis_list = [axis if axis >= 0 else (axis + rank) for axis in axis_list]
-                if axis_list and 0 not in axis_list:
-                    return list(op.inputs[:-1]), op.outputs
-        elif op.type == 'ExpandDims':
-            pass
-        elif op.type == 'Stack':
-            pass
-        elif op.type in {'BatchMatMul', 'BatchMatMulV2'}:
-            pass
-        elif op.type == 'Cumprod':
-            pass
-        elif op.type == 'Cumsum':
-            pass
-        elif op.type == 'MatMul':
-            if not op.node_def.attr['transpose_a'].b:
-                return list(op.inputs[:1]), op.outputs
-        elif op.type == 'Slice':
-            pass
-        elif op.type == 'StridedSlice':
-            pass
-        elif op.type == 'Shape':
-            pass
-        elif op.type == 'Reshape':
-            pass
-        elif op.type == 'Squeeze':
-            pass
-        elif op.type == 'Transpose':
-            pass
-        elif op.type == 'Unstack':
-            pass
         return [], []
 
+    # op type -> handler; op types not listed (ExpandDims, Reshape, Transpose, etc.) do not
+    # propagate dynamic batch size
+    _handler_map = {'Concat': _concat, 'ConcatV2': _concat, 'MatMul': _matmul}
+    _handler_map.update(dict.fromkeys(pseudo_unary_ops, _pseudo_unary))
+    _handler_map.update(dict.fromkeys(reduce_axis_ops, _reduce_axis))
+    _handler_map.update(dict.fromkeys(binary_broadcast_ops, _binary_broadcast))
+    _handler_map.update(dict.fromkeys(unary_ops, _unary))
+
 
 def _get_int32_values(const_op):
     tensor_proto = const_op.node_def.attr['value'].tensor
@@ -940,10 +967,7 @@ def _get_int32_values(const_op):
         return []
     content = tensor_proto.tensor_content
     if content:
-        int_val = []
-        for start in range(0, len(content), dtype.size):
-            encoded_int = content[start:start+dtype.size]
-            int_val.append(int.from_bytes(encoded_int, byteorder=sys.byteorder, signed=True))
-        return int_val
+        # tensor_content holds int32 values in native byte order
+        return list(struct.unpack('={}i'.format(len(content) // dtype.size), content))
     else:
         return tensor_proto.int_val
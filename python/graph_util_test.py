@@ -621,6 +621,30 @@ class TestDynamicBatchSize(TestV1Only):
         _assert_compiler_success(infer_graph)
         assert infer_graph.get_operations()[-2].get_attr('input_batch_axis') == [-1]
 
+    def test_binary_broadcast_same_rank(self):
+        dbs = graph_util.DynamicBatchSizeHelper()
+
+        def dynamic_input_names(shape0, shape1):
+            with tf.Graph().as_default():
+                input0 = tf.placeholder(tf.float32, shape0, name='input0')
+                input1 = tf.placeholder(tf.float32, shape1, name='input1')
+                add0 = tf.add(input0, input1, name='add0')
+                inputs, outputs = dbs.dynamic_inputs_outputs(add0.op)
+                if inputs:
+                    assert [ts.name for ts in outputs] == ['add0:0']
+                else:
+                    assert not outputs
+                return [ts.name for ts in inputs]
+
+        # both inputs must have dynamic batch size unless one of them is broadcast along batch
+        assert dynamic_input_names([None, 3], [None, 3]) == ['input0:0', 'input1:0']
+        assert dynamic_input_names([None, 3], [5, 3]) == ['input0:0', 'input1:0']
+        assert dynamic_input_names([5, 3], [None, 3]) == ['input0:0', 'input1:0']
+        assert dynamic_input_names([None, 3], [1, 3]) == ['input0:0']
+        assert dynamic_input_names([1, 3], [None, 3]) == ['input1:0']
+        assert dynamic_input_names([1, 3], [1, 3]) == []
+        assert dynamic_input_names([], []) == []
+
     def test_split_output(self):
         with tf.Session(graph=tf.Graph()) as sess:
             input0 = tf.placeholder(tf.float16, [3, 3], name='input0')
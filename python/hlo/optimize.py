@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import functools
 import itertools
 import logging
+import operator
 import numpy as np
 from tensorflow.compiler.xla import xla_data_pb2
 from tensorflow.compiler.xla.service import hlo_pb2
@@ -778,7 +780,7 @@ class HloTensor:
     @property
     def num_bytes(self):
         itemsize = 2 if self.dtype == 'bfloat16' else np.dtype(self.dtype).itemsize
-        return itemsize * int(np.prod(self.shape))
+        return itemsize * int(functools.reduce(operator.mul, self.shape, 1))
 
 
 @decorate_methods_with(staticmethod)
@@ -31,13 +31,13 @@ def get_model_config(executable):
 
 _NC_HEADER_SIZE = 544
 _MAX_NUM_CORES = 64
+_NC_HEADER = struct.Struct('168xI304xI64B')
 
 
 def get_cores_from_executable(executable):
-    header = executable[:_NC_HEADER_SIZE]
-    if len(header) != _NC_HEADER_SIZE:
+    if len(executable) < _NC_HEADER_SIZE:
         return None
-    info = struct.unpack('168xI304xI64B', header)
+    info = _NC_HEADER.unpack_from(executable)
     if len(info) != 1 + 1 + _MAX_NUM_CORES:
         return None
     opt_num_cores = info[0]
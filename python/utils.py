@@ -32,13 +32,16 @@ def logging_show_info():
 
 
 def most_popular_namescope(all_node_names):
-    all_splitted = [name.split('/') for name in all_node_names]
-    max_level = max(len(splitted) for splitted in all_splitted)
+    level_counters = []
+    for name in all_node_names:
+        for lvl, scope in enumerate(name.split('/')):
+            if lvl == len(level_counters):
+                level_counters.append(collections.Counter())
+            level_counters[lvl][scope] += 1
     most_popular_namescope = []
     max_popularity = 0
-    for lvl in range(max_level):
-        names = [splitted[lvl] for splitted in all_splitted if lvl < len(splitted)]
-        (scope, popularity), = collections.Counter(names).most_common(1)
+    for counter in level_counters:
+        (scope, popularity), = counter.most_common(1)
         if popularity >= max_popularity:
             most_popular_namescope.append(scope)
             max_popularity = popularity